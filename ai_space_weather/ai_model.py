@@ -3,10 +3,8 @@ import json
 import os
 import pickle
 import sys
-from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score, mean_absolute_error
 from datetime import datetime, timedelta
+from ai_space_weather import instrumentation
 
 # Resource path helper: works for development and for PyInstaller exe.
 def resource_path(relative_path):
@@ -22,6 +20,7 @@ TIME_MODEL_FILE = "data/solar_flare_time_model.pkl"
 DATA_FILE = "data/space_weather_data.json"
 PREDICTION_FILE = "data/solar_predictions.json"
 
+@instrumentation.timed("features.extract")
 def extract_features(entry, geo_storm_data, cme_data, sep_data, ips_data):
     """
     Extract base features from a solar flare entry.
@@ -57,14 +56,12 @@ def extract_features(entry, geo_storm_data, cme_data, sep_data, ips_data):
 
     return [day, hour, month, intensity, storm_level, duration, cme_count, sep_count, ips_count]
 
-def train_ai_model():
-    if not os.path.exists(resource_path(DATA_FILE)):
-        print("No data available for training.")
-        return
-
-    with open(resource_path(DATA_FILE), "r") as f:
-        data = json.load(f)
-
+@instrumentation.timed("features.build_training_set")
+def build_training_set(data):
+    """
+    Build the training set from the loaded space weather data.
+    Returns (features, class_labels, reg_targets), or None if there is not enough data.
+    """
     solar_flare_data = data.get("solar_flares", [])
     geo_storm_data = data.get("geomagnetic_storms", [])
     cme_data = data.get("coronal_mass_ejections", [])
@@ -73,7 +70,7 @@ def train_ai_model():
 
     if len(solar_flare_data) < 10:
         print("Not enough data for training.")
-        return
+        return None
 
     # Sort flare data chronologically
     solar_flare_data.sort(key=lambda x: x.get("beginTime", ""))
@@ -125,6 +122,24 @@ def train_ai_model():
         interval = max((next_dt - current_dt).days, 1)
         reg_targets.append(interval)
 
+    return features, class_labels, reg_targets
+
+def save_model(model, relative_path):
+    """Pickle a model through a temp file, so an interrupted write never leaves a truncated model."""
+    path = resource_path(relative_path)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(model, f)
+    os.replace(tmp_path, path)
+
+@instrumentation.timed("model.fit")
+def fit_models(features, class_labels, reg_targets):
+    """Fit the intensity classifier and interval regressor and save them to disk."""
+    # scikit-learn is imported here so headless runs that skip training don't pay its import cost.
+    from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+    from sklearn.model_selection import train_test_split
+    from sklearn.metrics import accuracy_score, mean_absolute_error
+
     # Build separate feature arrays:
     # For classifier, use the full feature vector.
     X_class = np.array(features)
@@ -144,8 +159,7 @@ def train_ai_model():
     y_pred = classifier.predict(X_test_class)
     acc = accuracy_score(y_test_class, y_pred)
     print("Model Accuracy:", acc)
-    with open(resource_path(MODEL_FILE), "wb") as f:
-        pickle.dump(classifier, f)
+    save_model(classifier, MODEL_FILE)
 
     # Train regressor (predict time interval until next flare) using features without lag
     regressor = RandomForestRegressor(n_estimators=100, max_depth=10, random_state=42)
@@ -153,8 +167,20 @@ def train_ai_model():
     y_time_pred = regressor.predict(X_test_reg)
     mae = mean_absolute_error(y_test_time, y_time_pred)
     print("Time Prediction Error:", mae)
-    with open(resource_path(TIME_MODEL_FILE), "wb") as f:
-        pickle.dump(regressor, f)
+    save_model(regressor, TIME_MODEL_FILE)
+
+def train_ai_model():
+    if not os.path.exists(resource_path(DATA_FILE)):
+        print("No data available for training.")
+        return
+
+    with instrumentation.span("json.load"), open(resource_path(DATA_FILE), "r") as f:
+        data = json.load(f)
+
+    training_set = build_training_set(data)
+    if training_set is None:
+        return
+    fit_models(*training_set)
 
 def load_or_train_models(retrain=False):
     model_path = resource_path(MODEL_FILE)
@@ -162,12 +188,14 @@ def load_or_train_models(retrain=False):
     if retrain or not (os.path.exists(model_path) and os.path.exists(time_model_path)):
         print("Training models...")
         train_ai_model()
-    with open(model_path, "rb") as f:
-        classifier = pickle.load(f)
-    with open(time_model_path, "rb") as f:
-        regressor = pickle.load(f)
+    with instrumentation.span("model.load"):
+        with open(model_path, "rb") as f:
+            classifier = pickle.load(f)
+        with open(time_model_path, "rb") as f:
+            regressor = pickle.load(f)
     return classifier, regressor
 
+@instrumentation.timed("predictions.save")
 def save_prediction(predicted_class, estimated_days):
     estimated_date = (datetime.utcnow() + timedelta(days=estimated_days)).strftime("%Y-%m-%d")
     prediction_entry = {
@@ -193,7 +221,7 @@ def save_prediction(predicted_class, estimated_days):
 def predict_next_solar_event():
     if not (os.path.exists(resource_path(DATA_FILE)) and os.path.exists(resource_path(MODEL_FILE)) and os.path.exists(resource_path(TIME_MODEL_FILE))):
         return "No prediction available (Train model first)"
-    with open(resource_path(DATA_FILE), "r") as f:
+    with instrumentation.span("json.load"), open(resource_path(DATA_FILE), "r") as f:
         data = json.load(f)
     solar_flares = data.get("solar_flares", [])
     geo_storm_data = data.get("geomagnetic_storms", [])
@@ -224,8 +252,9 @@ def predict_next_solar_event():
     classifier, regressor = load_or_train_models(retrain=False)
     test_features_class = np.array([full_feat])
     test_features_reg = np.array([reg_feat])
-    class_prediction = classifier.predict(test_features_class)[0]
-    time_prediction = regressor.predict(test_features_reg)[0]
+    with instrumentation.span("model.inference"):
+        class_prediction = classifier.predict(test_features_class)[0]
+        time_prediction = regressor.predict(test_features_reg)[0]
     time_prediction = max(time_prediction, 1)
     prediction_map = {5: "X-Class", 4: "M-Class", 3: "C-Class", 2: "B-Class", 1: "A-Class"}
     predicted_class = prediction_map.get(class_prediction, f"Unknown ({class_prediction})")
@@ -240,6 +269,7 @@ def predict_next_solar_event():
     save_prediction(predicted_class, estimated_days)
     return f"Predicted Solar Event Class: {predicted_class} (Estimated in {estimated_days} days)"
 
+@instrumentation.timed("predictions.load")
 def load_past_predictions():
     if os.path.exists(resource_path(PREDICTION_FILE)):
         with open(resource_path(PREDICTION_FILE), "r") as f:
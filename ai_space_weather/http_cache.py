@@ -0,0 +1,176 @@
+"""
+Persistent on-disk cache for DONKI API responses.
+
+Entries are keyed by endpoint and query window (the API key is never part of the key).
+Closed historical windows are served straight from disk. Recent windows are revalidated
+with ETag / If-Modified-Since when the server supports it, otherwise they expire after
+RECENT_TTL. The cache is size-bounded with least-recently-used eviction, and offline
+mode (SPACE_WEATHER_OFFLINE=1) never touches the network.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+
+import requests
+
+from ai_space_weather import instrumentation
+
+CACHE_DIR = "data/http_cache"
+CACHE_MAX_BYTES = 200 * 1024 * 1024
+RECENT_TTL = 3600           # seconds a recent window is trusted before revalidating
+REQUEST_TIMEOUT = 60
+
+class CacheMiss(Exception):
+    """Raised in offline mode when a request is not in the cache."""
+
+def is_offline():
+    return os.environ.get("SPACE_WEATHER_OFFLINE", "").lower() in ("1", "true", "yes")
+
+def cache_key(url, params):
+    # The API key doesn't change the response, and must not end up in file names or on disk.
+    query = "&".join(f"{k}={params[k]}" for k in sorted(params) if k != "api_key")
+    return hashlib.sha256(f"{url}?{query}".encode("utf-8")).hexdigest()
+
+class ResponseCache:
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES, ttl=RECENT_TTL):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._size = None   # total bytes on disk, computed lazily on the first write
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + ".json")
+
+    def load(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "r") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # Reads bump the mtime, which is what LRU eviction orders by.
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry
+
+    def store(self, key, entry):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(entry, f)
+        new_size = os.path.getsize(tmp_path)
+        old_size = os.path.getsize(path) if os.path.exists(path) else 0
+        os.replace(tmp_path, path)
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += new_size - old_size
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _scan_size(self):
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".json"):
+                total += os.path.getsize(os.path.join(self.cache_dir, name))
+        return total
+
+    def _evict(self):
+        """Remove least recently used entries until the cache is back under 90% of its limit."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".json"):
+                stat = os.stat(os.path.join(self.cache_dir, name))
+                entries.append((stat.st_mtime, stat.st_size, name))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        for _, size, name in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+                total -= size
+            except OSError:
+                pass
+        self._size = total
+
+    def clear(self):
+        if os.path.isdir(self.cache_dir):
+            for name in os.listdir(self.cache_dir):
+                os.remove(os.path.join(self.cache_dir, name))
+        with self._lock:
+            self._size = 0
+
+    def get_json(self, url, params, closed, session=None, offline=None):
+        """
+        Return the decoded JSON for a GET request, using the cache where possible.
+
+        closed: True if the query window is in the settled past, so a cached response never expires.
+        Raises CacheMiss when offline and not cached, and requests.HTTPError on a failed
+        request with nothing cached to fall back on.
+        """
+        if offline is None:
+            offline = is_offline()
+        key = cache_key(url, params)
+        entry = self.load(key)
+
+        if entry is not None:
+            fresh = closed or time.time() - entry.get("fetched_at", 0) < self.ttl
+            if fresh or offline:
+                instrumentation.count("fetch.cache_hits")
+                return entry["body"]
+        elif offline:
+            raise CacheMiss(f"{url} {params.get('startDate')}..{params.get('endDate')} is not cached")
+
+        headers = {}
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        http = session or requests
+        instrumentation.count("fetch.requests")
+        try:
+            with instrumentation.span("fetch.request"):
+                response = http.get(url, params=params, headers=headers, timeout=REQUEST_TIMEOUT)
+        except requests.RequestException:
+            instrumentation.count("fetch.errors")
+            if entry is not None:
+                print(f"Network error for {url}, using cached response")
+                return entry["body"]
+            raise
+
+        instrumentation.count("fetch.bytes", len(response.content or b""))
+        if response.status_code == 304 and entry is not None:
+            instrumentation.count("fetch.not_modified")
+            entry["fetched_at"] = time.time()
+            self.store(key, entry)
+            return entry["body"]
+        if not 200 <= response.status_code < 300:
+            instrumentation.count("fetch.errors")
+            if entry is not None:
+                print(f"{url} returned {response.status_code}, using cached response")
+                return entry["body"]
+            raise requests.HTTPError(f"{url} returned {response.status_code}", response=response)
+
+        # DONKI answers an empty window with an empty body rather than [].
+        body = response.json() if response.text.strip() else []
+        self.store(key, {
+            "url": url,
+            "params": {k: v for k, v in params.items() if k != "api_key"},
+            "closed": closed,
+            "fetched_at": time.time(),
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "body": body,
+        })
+        return body
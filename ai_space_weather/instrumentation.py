@@ -0,0 +1,269 @@
+"""
+Lightweight timing spans and counters for the hot paths.
+
+Disabled by default, when span() hands back a shared no-op context manager and
+count()/observe()/frame_tick() return after a single flag check. Enable with
+SPACE_WEATHER_PROFILE=1 (or enable() / the --profile flag of the headless commands) to get:
+  - a per-run summary printed and written as JSON when the process exits,
+  - a cProfile dump (<run>.prof, for snakeviz/gprof2dot/flameprof) covering the enabling
+    thread and every function wrapped in profiled(), and a folded-stack file of the
+    spans (<run>.folded, for flamegraph.pl / speedscope),
+  - Prometheus text metrics via render_prometheus() or serve_metrics(port).
+Files go to SPACE_WEATHER_PROFILE_DIR (default "profile").
+"""
+import atexit
+import cProfile
+import json
+import os
+import pstats
+import re
+import threading
+import time
+from datetime import datetime
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PROFILE_DIR = "profile"
+METRIC_PREFIX = "space_weather"
+
+_enabled = False
+_lock = threading.Lock()
+_spans = {}         # name -> [count, total_seconds, max_seconds]
+_counters = {}      # name -> value
+_folded = {}        # "outer;inner" span stack -> self time in microseconds
+_last_tick = {}     # frame_tick name -> perf_counter of the previous tick
+_local = threading.local()
+_profiler = None
+_profiler_thread = None
+_thread_profiles = []   # finished cProfile.Profile objects from profiled(), merged into the dump
+_run_name = None
+
+class _NoopSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NOOP_SPAN = _NoopSpan()
+
+class _Span:
+    __slots__ = ("name", "started", "children")
+
+    def __init__(self, name):
+        self.name = name
+        self.children = 0.0
+
+    def __enter__(self):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        stack.append(self)
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.started
+        stack = _local.stack
+        path = ";".join(s.name for s in stack)
+        stack.pop()
+        if stack:
+            stack[-1].children += elapsed
+        _record(self.name, elapsed)
+        with _lock:
+            _folded[path] = _folded.get(path, 0) + int((elapsed - self.children) * 1e6)
+        return False
+
+def _record(name, seconds):
+    with _lock:
+        stat = _spans.get(name)
+        if stat is None:
+            _spans[name] = [1, seconds, seconds]
+        else:
+            stat[0] += 1
+            stat[1] += seconds
+            if seconds > stat[2]:
+                stat[2] = seconds
+
+# ---------------------------------------
+# Recording API
+# ---------------------------------------
+def enabled():
+    return _enabled
+
+def span(name):
+    """Context manager timing the enclosed block under `name`."""
+    if not _enabled:
+        return _NOOP_SPAN
+    return _Span(name)
+
+def timed(name):
+    """Decorator form of span()."""
+    def decorate(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with _Span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def profiled(fn):
+    """
+    Decorator for functions that run on their own thread (pipeline stages, the refresh
+    scheduler loop). cProfile only sees the thread that enabled it, so while profiling
+    these run under a profiler of their own, merged into the dump by finish().
+    """
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        if _profiler is None or threading.get_ident() == _profiler_thread:
+            return fn(*args, **kwargs)
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Newer Pythons allow one active profiler per process, which then sees every thread.
+            return fn(*args, **kwargs)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            profiler.disable()
+            with _lock:
+                _thread_profiles.append(profiler)
+    return wrapper
+
+def count(name, value=1):
+    """Add `value` to the counter `name`."""
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+def observe(name, seconds):
+    """Record a duration measured elsewhere (e.g. a frame interval)."""
+    if not _enabled:
+        return
+    _record(name, seconds)
+
+def frame_tick(name):
+    """Call once per frame; records the time since the previous frame with the same name."""
+    if not _enabled:
+        return
+    now = time.perf_counter()
+    last = _last_tick.get(name)
+    _last_tick[name] = now
+    if last is not None:
+        _record(name, now - last)
+
+# ---------------------------------------
+# Reporting
+# ---------------------------------------
+def summary():
+    with _lock:
+        spans = {name: {"count": c, "total_seconds": round(total, 6), "mean_seconds": round(total / c, 6),
+                        "max_seconds": round(peak, 6)}
+                 for name, (c, total, peak) in sorted(_spans.items())}
+        counters = dict(sorted(_counters.items()))
+    return {"spans": spans, "counters": counters}
+
+def _metric_name(name):
+    return f"{METRIC_PREFIX}_" + re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+def render_prometheus():
+    """Return all spans and counters in the Prometheus text exposition format."""
+    data = summary()
+    lines = []
+    for name, stat in data["spans"].items():
+        metric = _metric_name(name) + "_seconds"
+        lines.append(f"# TYPE {metric} summary")
+        lines.append(f"{metric}_count {stat['count']}")
+        lines.append(f"{metric}_sum {stat['total_seconds']}")
+        lines.append(f"# TYPE {metric}_max gauge")
+        lines.append(f"{metric}_max {stat['max_seconds']}")
+    for name, value in data["counters"].items():
+        metric = _metric_name(name) + "_total"
+        lines.append(f"# TYPE {metric} counter")
+        lines.append(f"{metric} {value}")
+    return "\n".join(lines) + "\n"
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip("/") not in ("", "/metrics"):
+            self.send_error(404)
+            return
+        body = render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def serve_metrics(port, host="127.0.0.1"):
+    """Serve /metrics on a background thread. Returns the server (call shutdown() to stop it)."""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    print(f"Serving metrics on http://{host}:{server.server_address[1]}/metrics")
+    return server
+
+# ---------------------------------------
+# Run lifecycle
+# ---------------------------------------
+def enable(profile=True):
+    """
+    Start recording. With profile=True the calling thread, and functions wrapped in
+    profiled() on other threads, run under cProfile. The summary and profile are written
+    by finish(), which runs at exit; threads still running by then are not in the profile.
+    """
+    global _enabled, _profiler, _profiler_thread, _run_name
+    if _enabled:
+        return
+    _enabled = True
+    _run_name = datetime.now().strftime("run-%Y%m%d-%H%M%S")
+    if profile:
+        _profiler = cProfile.Profile()
+        _profiler_thread = threading.get_ident()
+        _profiler.enable()
+    atexit.register(finish)
+
+def finish():
+    """Stop recording and write the summary, cProfile and folded-stack files."""
+    global _enabled, _profiler
+    if not _enabled:
+        return
+    _enabled = False
+    out_dir = os.environ.get("SPACE_WEATHER_PROFILE_DIR", PROFILE_DIR)
+    os.makedirs(out_dir, exist_ok=True)
+    base = os.path.join(out_dir, _run_name)
+    if _profiler is not None:
+        _profiler.disable()
+        stats = pstats.Stats(_profiler)
+        with _lock:
+            thread_profiles = list(_thread_profiles)
+            _thread_profiles.clear()
+        for profiler in thread_profiles:
+            stats.add(profiler)
+        stats.dump_stats(base + ".prof")
+        _profiler = None
+    with _lock:
+        folded = dict(_folded)
+    with open(base + ".folded", "w") as f:
+        for path, micros in sorted(folded.items()):
+            if micros > 0:
+                f.write(f"{path} {micros}\n")
+    data = summary()
+    with open(base + ".json", "w") as f:
+        json.dump(data, f, indent=4)
+
+    print(f"--- Profile summary ({base}.json) ---")
+    for name, stat in data["spans"].items():
+        print(f"{name:32s} {stat['count']:7d}x  total {stat['total_seconds'] * 1000:10.1f} ms"
+              f"  mean {stat['mean_seconds'] * 1000:8.2f} ms  max {stat['max_seconds'] * 1000:8.2f} ms")
+    for name, value in data["counters"].items():
+        print(f"{name:32s} {value}")
+
+if os.environ.get("SPACE_WEATHER_PROFILE", "").lower() in ("1", "true", "yes"):
+    enable()
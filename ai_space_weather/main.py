@@ -3,10 +3,11 @@ import os
 import json
 from tkinter import ttk
 from tkinter.scrolledtext import ScrolledText
-import random, math, time, threading
+import random, math
 from datetime import datetime
 from ai_space_weather.ai_model import predict_next_solar_event, load_past_predictions
-from ai_space_weather.weather_fetch import fetch_space_weather
+from ai_space_weather.scheduler import RefreshScheduler
+from ai_space_weather import instrumentation
 from PIL import Image, ImageTk  # Only if you plan to use images for Earth, etc.
 # ---------------------------------------
 # Dynamic Starfield for the Prediction Tab
@@ -33,12 +34,12 @@ def twinkle_stars(canvas):
     # Update every 200ms (adjust as desired)
     canvas.after(200, lambda: twinkle_stars(canvas))
     
-def start_prediction_animation(canvas):
+def start_prediction_animation(canvas, scheduler=None):
     # Wait until the canvas has a valid size
     width = int(canvas.winfo_width())
     height = int(canvas.winfo_height())
     if width < 50 or height < 50:
-        canvas.after(100, lambda: start_prediction_animation(canvas))
+        canvas.after(100, lambda: start_prediction_animation(canvas, scheduler))
         return
 
     # Save the current size for later comparison
@@ -80,6 +81,8 @@ def start_prediction_animation(canvas):
 
     def animate_orbit():
         nonlocal angle
+        # Interval between orbit frames; should stay close to the 50ms target.
+        instrumentation.frame_tick("tk.frame_interval")
         rad = math.radians(angle)
         ex = sun_center_x + orbit_radius * math.cos(rad)
         ey = sun_center_y + orbit_radius * math.sin(rad)
@@ -92,13 +95,6 @@ def start_prediction_animation(canvas):
 
     animate_orbit()
 
-    def update_prediction_text():
-        event_str = predict_next_solar_event()
-        canvas.itemconfig("pred_text", text=event_str)
-        canvas.after(30000, update_prediction_text)
-
-    update_prediction_text()
-
     # Bind a resize event to reinitialize the entire animation if the canvas size changes
     def handle_resize(event):
         new_width, new_height = event.width, event.height
@@ -106,7 +102,7 @@ def start_prediction_animation(canvas):
         if not hasattr(canvas, "last_size") or (new_width, new_height) != canvas.last_size:
             canvas.last_size = (new_width, new_height)
             canvas.delete("all")  # Clear all items
-            start_prediction_animation(canvas)
+            start_prediction_animation(canvas, scheduler)
     canvas.bind("<Configure>", handle_resize)
 
     # Create the prediction text near the bottom center
@@ -118,12 +114,12 @@ def start_prediction_animation(canvas):
         anchor="center"
     )
 
-    def update_prediction_text():
-        event_str = predict_next_solar_event()
-        canvas.itemconfig(prediction_text_id, text=event_str)
-        canvas.after(30000, update_prediction_text)
+    # The scheduler recomputes the prediction when new data lands; we only redraw the text.
+    def show_prediction(results):
+        canvas.itemconfig(prediction_text_id, text=results["prediction"])
 
-    update_prediction_text()
+    if scheduler is not None:
+        scheduler.subscribe(lambda results: canvas.after(0, show_prediction, results))
 
     def handle_resize(event):
         new_width, new_height = event.width, event.height
@@ -141,8 +137,6 @@ def start_prediction_animation(canvas):
 # ---------------------------------------
 import os
 import json
-import time
-import threading
 from datetime import datetime
 import tkinter as tk
 
@@ -164,101 +158,112 @@ def format_datetime(dt_str):
     except Exception:
         return dt_str  # fallback to original if parsing fails
 
-def update_history_text(scrolled_text):
+def build_history_text(data, ai_prediction, past_predictions):
+    """Build the history tab text from the loaded data file contents."""
+    # Format the "Last Updated" timestamp
+    last_updated_raw = data.get("timestamp", "Unknown")
+    if last_updated_raw != "Unknown":
+        last_updated = format_datetime(last_updated_raw)
+    else:
+        last_updated = "Unknown"
+
+    # Solar flares (format beginTime)
+    solar_flares = data.get("solar_flares", [])
+    solar_flares_text = "\n".join([
+        f"{flare.get('classType', 'Unknown')} at {format_datetime(flare.get('beginTime', 'Unknown'))}, Duration: {flare.get('duration', 'N/A')}s"
+        for flare in solar_flares[-5:]
+    ])
+
+    # Geomagnetic Storms (format startTime)
+    geo_storms = data.get("geomagnetic_storms", [])
+    geo_storms_text = "\n".join([
+        f"Storm Level {storm.get('kpIndex', 'N/A')} at {format_datetime(storm.get('startTime', 'Unknown'))}"
+        for storm in geo_storms[-3:]
+    ])
+
+    # CME Events (format startTime)
+    cme_events = data.get("coronal_mass_ejections", [])
+    cme_text = "\n".join([
+        f"Speed: {cme.get('speed', 'N/A')} km/s, Type: {cme.get('type', 'N/A')} at {format_datetime(cme.get('startTime', 'Unknown'))}"
+        for cme in cme_events[-3:]
+    ])
+
+    # SEP Events (format eventTime)
+    sep_events = data.get("solar_energetic_particles", [])
+    sep_text = "\n".join([
+        f"Source: {sep.get('source', 'N/A')} at {format_datetime(sep.get('eventTime', 'Unknown'))}"
+        for sep in sep_events[-3:]
+    ])
+
+    # IPS Events (format eventTime)
+    ips_events = data.get("interplanetary_shocks", [])
+    ips_text = "\n".join([
+        f"Location: {ips.get('location', 'N/A')} at {format_datetime(ips.get('eventTime', 'Unknown'))}"
+        for ips in ips_events[-3:]
+    ])
+
+    # Upcoming Events (format predictedTime)
+    upcoming_events = data.get("upcoming_events", [])
+    if upcoming_events:
+        upcoming_text = "\n".join([
+            f"{event.get('type', 'Unknown Event')} expected at {format_datetime(event.get('predictedTime', 'Unknown'))}"
+            for event in upcoming_events
+        ])
+    else:
+        upcoming_text = "No upcoming solar events."
+
+    return (
+        f"Last Updated: {last_updated}\n\n"
+        "=== Recent Solar Flares ===\n" + (solar_flares_text or "No recent solar flares.") + "\n\n"
+        "=== Geomagnetic Storms ===\n" + (geo_storms_text or "No recent geomagnetic storms.") + "\n\n"
+        "=== CME Events ===\n" + (cme_text or "No recent CMEs.") + "\n\n"
+        "=== SEP Events ===\n" + (sep_text or "No recent SEP events.") + "\n\n"
+        "=== IPS Events ===\n" + (ips_text or "No recent IPS events.") + "\n\n"
+        "=== Upcoming Events ===\n" + upcoming_text + "\n\n"
+        "=== AI Prediction ===\n" + ai_prediction + "\n\n"
+        "=== Past Predictions ===\n" + past_predictions
+    )
+
+def update_history_text(scrolled_text, ai_prediction=None):
+    """
+    Render the history tab. If ai_prediction is None the prediction is computed here.
+    The widget is only rewritten when the rendered text differs from what it shows.
+    """
     from ai_space_weather.ai_model import resource_path  # if not already imported
     data_file = resource_path("data/space_weather_data.json")
     if not os.path.exists(data_file):
-        scrolled_text.delete("1.0", tk.END)
-        scrolled_text.insert(tk.END, "No data available.")
+        set_history_text(scrolled_text, "No data available.")
         return
 
     try:
         with open(data_file, "r") as f:
             data = json.load(f)
 
-        # Format the "Last Updated" timestamp
-        last_updated_raw = data.get("timestamp", "Unknown")
-        if last_updated_raw != "Unknown":
-            last_updated = format_datetime(last_updated_raw)
-        else:
-            last_updated = "Unknown"
-
-        # Solar flares (format beginTime)
-        solar_flares = data.get("solar_flares", [])
-        solar_flares_text = "\n".join([
-            f"{flare.get('classType', 'Unknown')} at {format_datetime(flare.get('beginTime', 'Unknown'))}, Duration: {flare.get('duration', 'N/A')}s"
-            for flare in solar_flares[-5:]
-        ])
-
-        # Geomagnetic Storms (format startTime)
-        geo_storms = data.get("geomagnetic_storms", [])
-        geo_storms_text = "\n".join([
-            f"Storm Level {storm.get('kpIndex', 'N/A')} at {format_datetime(storm.get('startTime', 'Unknown'))}"
-            for storm in geo_storms[-3:]
-        ])
-
-        # CME Events (format startTime)
-        cme_events = data.get("coronal_mass_ejections", [])
-        cme_text = "\n".join([
-            f"Speed: {cme.get('speed', 'N/A')} km/s, Type: {cme.get('type', 'N/A')} at {format_datetime(cme.get('startTime', 'Unknown'))}"
-            for cme in cme_events[-3:]
-        ])
-
-        # SEP Events (format eventTime)
-        sep_events = data.get("solar_energetic_particles", [])
-        sep_text = "\n".join([
-            f"Source: {sep.get('source', 'N/A')} at {format_datetime(sep.get('eventTime', 'Unknown'))}"
-            for sep in sep_events[-3:]
-        ])
-
-        # IPS Events (format eventTime)
-        ips_events = data.get("interplanetary_shocks", [])
-        ips_text = "\n".join([
-            f"Location: {ips.get('location', 'N/A')} at {format_datetime(ips.get('eventTime', 'Unknown'))}"
-            for ips in ips_events[-3:]
-        ])
-
-        # Upcoming Events (format predictedTime)
-        upcoming_events = data.get("upcoming_events", [])
-        if upcoming_events:
-            upcoming_text = "\n".join([
-                f"{event.get('type', 'Unknown Event')} expected at {format_datetime(event.get('predictedTime', 'Unknown'))}"
-                for event in upcoming_events
-            ])
-        else:
-            upcoming_text = "No upcoming solar events."
-
         # AI Prediction and Past Predictions
         from ai_space_weather.ai_model import predict_next_solar_event, load_past_predictions
-        ai_prediction = predict_next_solar_event()
+        if ai_prediction is None:
+            ai_prediction = predict_next_solar_event()
         past_predictions = load_past_predictions()
 
-        full_text = (
-            f"Last Updated: {last_updated}\n\n"
-            "=== Recent Solar Flares ===\n" + (solar_flares_text or "No recent solar flares.") + "\n\n"
-            "=== Geomagnetic Storms ===\n" + (geo_storms_text or "No recent geomagnetic storms.") + "\n\n"
-            "=== CME Events ===\n" + (cme_text or "No recent CMEs.") + "\n\n"
-            "=== SEP Events ===\n" + (sep_text or "No recent SEP events.") + "\n\n"
-            "=== IPS Events ===\n" + (ips_text or "No recent IPS events.") + "\n\n"
-            "=== Upcoming Events ===\n" + upcoming_text + "\n\n"
-            "=== AI Prediction ===\n" + ai_prediction + "\n\n"
-            "=== Past Predictions ===\n" + past_predictions
-        )
-
-        scrolled_text.delete("1.0", tk.END)
-        scrolled_text.insert(tk.END, full_text)
+        full_text = build_history_text(data, ai_prediction, past_predictions)
+
+        with instrumentation.span("tk.history_render"):
+            set_history_text(scrolled_text, full_text)
 
     except Exception as e:
-        scrolled_text.delete("1.0", tk.END)
-        scrolled_text.insert(tk.END, f"Error loading data: {e}")
+        set_history_text(scrolled_text, f"Error loading data: {e}")
 
-def start_history_updates(scrolled_text):
-    def auto_update():
-        while True:
-            update_history_text(scrolled_text)
-            time.sleep(1800)
-    t = threading.Thread(target=auto_update, daemon=True)
-    t.start()
+def set_history_text(scrolled_text, text):
+    """Replace the widget's text, skipping the redraw if nothing changed."""
+    if getattr(scrolled_text, "last_text", None) == text:
+        return
+    scrolled_text.last_text = text
+    scrolled_text.delete("1.0", tk.END)
+    scrolled_text.insert(tk.END, text)
+
+def start_history_updates(scrolled_text, scheduler):
+    # Re-render whenever the scheduler publishes new results (new data or a new prediction).
+    scheduler.subscribe(lambda results: scrolled_text.after(0, update_history_text, scrolled_text, results["prediction"]))
 
 # ---------------------------------------
 # Main UI
@@ -287,8 +292,11 @@ def main():
     pred_canvas = tk.Canvas(prediction_tab, bg="black")
     pred_canvas.pack(fill="both", expand=True)
 
+    # One scheduler owns fetching, retraining and prediction for the whole UI.
+    scheduler = RefreshScheduler()
+
     def init_prediction_tab():
-        start_prediction_animation(pred_canvas)
+        start_prediction_animation(pred_canvas, scheduler)
     root.after(100, init_prediction_tab)
 
     # --- History tab (White Background) ---
@@ -305,11 +313,14 @@ def main():
     history_text = ScrolledText(history_tab, wrap="word", width=80, height=25, bg="white", fg="black", font=("Helvetica", 11))
     history_text.pack(fill="both", expand=True, padx=10, pady=10)
 
-    # Load the data
-    update_history_text(history_text)
-    start_history_updates(history_text)
+    # Show the stored data right away; the prediction fills in once the scheduler has run.
+    update_history_text(history_text, ai_prediction="Updating...")
+    start_history_updates(history_text, scheduler)
+    scheduler.start()
 
     root.mainloop()
+    # Let a background fetch or retrain finish writing before the process exits.
+    scheduler.stop()
 
 if __name__ == "__main__":
     main()
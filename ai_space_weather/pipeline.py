@@ -0,0 +1,299 @@
+"""
+Headless fetch -> features -> train -> predict -> export pipeline.
+
+Each stage records content hashes of its inputs and outputs in STATE_FILE, and is
+skipped when nothing upstream changed. Stages whose dependencies are done run in parallel.
+
+Usage:
+    python -m ai_space_weather.pipeline                  # run every stage
+    python -m ai_space_weather.pipeline predict --no-fetch
+    python -m ai_space_weather.pipeline --force train
+    python -m ai_space_weather.pipeline --offline        # fetch from the response cache only
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+
+from ai_space_weather import instrumentation
+from ai_space_weather.ai_model import resource_path, DATA_FILE, MODEL_FILE, TIME_MODEL_FILE, PREDICTION_FILE
+
+FEATURES_FILE = "data/training_features.json"
+EXPORT_FILE = "data/space_weather_events.csv"
+STATE_FILE = "data/pipeline_state.json"
+
+# Bump when a stage's behaviour changes so previously recorded runs are invalidated.
+PIPELINE_VERSION = 1
+
+# ---------------------------------------
+# Content hashing
+# ---------------------------------------
+def file_hash(path):
+    """
+    Return the sha256 of a file's content, or None if it does not exist.
+    For JSON objects the top-level "timestamp" is ignored, so a fetch that
+    returns the same DONKI data doesn't look like a change.
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        raw = f.read()
+    if path.endswith(".json"):
+        try:
+            data = json.loads(raw)
+        except ValueError:
+            data = None
+        if isinstance(data, dict):
+            data.pop("timestamp", None)
+            raw = json.dumps(data, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()
+
+def load_state():
+    path = resource_path(STATE_FILE)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except ValueError:
+        return {}
+
+def save_state(state):
+    path = resource_path(STATE_FILE)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f, indent=4)
+    os.replace(tmp_path, path)
+
+# ---------------------------------------
+# Stages
+# ---------------------------------------
+def run_fetch():
+    from ai_space_weather.weather_fetch import fetch_space_weather
+    if not fetch_space_weather():
+        raise RuntimeError("Fetching space weather data failed.")
+
+def run_features():
+    from ai_space_weather.ai_model import build_training_set
+    with open(resource_path(DATA_FILE), "r") as f:
+        data = json.load(f)
+    training_set = build_training_set(data)
+    if training_set is None:
+        raise RuntimeError("Not enough data for training.")
+    features, class_labels, reg_targets = training_set
+    path = resource_path(FEATURES_FILE)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"features": features, "class_labels": class_labels, "reg_targets": reg_targets}, f)
+    os.replace(tmp_path, path)
+
+def run_train():
+    from ai_space_weather.ai_model import fit_models
+    with open(resource_path(FEATURES_FILE), "r") as f:
+        training_set = json.load(f)
+    fit_models(training_set["features"], training_set["class_labels"], training_set["reg_targets"])
+
+def run_predict():
+    from ai_space_weather.ai_model import predict_next_solar_event
+    return predict_next_solar_event()
+
+def run_export():
+    """Flatten every stored event into one CSV for spreadsheets and other tools."""
+    with open(resource_path(DATA_FILE), "r") as f:
+        data = json.load(f)
+    rows = []
+    for flare in data.get("solar_flares", []):
+        rows.append(("solar_flare", flare.get("beginTime", "Unknown"), flare.get("classType", "Unknown")))
+    for storm in data.get("geomagnetic_storms", []):
+        rows.append(("geomagnetic_storm", storm.get("startTime", "Unknown"), f"Kp {storm.get('kpIndex', 'N/A')}"))
+    for cme in data.get("coronal_mass_ejections", []):
+        rows.append(("cme", cme.get("startTime", "Unknown"), f"{cme.get('speed', 'N/A')} km/s, type {cme.get('type', 'N/A')}"))
+    for sep in data.get("solar_energetic_particles", []):
+        rows.append(("sep", sep.get("eventTime", "Unknown"), sep.get("source", "N/A")))
+    for ips in data.get("interplanetary_shocks", []):
+        rows.append(("ips", ips.get("eventTime", "Unknown"), ips.get("location", "Unknown")))
+    rows.sort(key=lambda row: row[1])
+    path = resource_path(EXPORT_FILE)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["event_type", "time", "details"])
+        writer.writerows(rows)
+    os.replace(tmp_path, path)
+
+def predict_salt():
+    # Predictions are expressed in days from today, so they go stale at midnight UTC.
+    return datetime.utcnow().strftime("%Y-%m-%d")
+
+# name -> dependencies, input files, output files, runner, optional extra fingerprint input
+STAGES = {
+    "fetch": {"deps": [], "inputs": [], "outputs": [DATA_FILE], "run": run_fetch, "always": True},
+    "features": {"deps": ["fetch"], "inputs": [DATA_FILE], "outputs": [FEATURES_FILE], "run": run_features},
+    "train": {"deps": ["features"], "inputs": [FEATURES_FILE], "outputs": [MODEL_FILE, TIME_MODEL_FILE], "run": run_train},
+    "predict": {"deps": ["fetch", "train"], "inputs": [DATA_FILE, MODEL_FILE, TIME_MODEL_FILE],
+                "outputs": [PREDICTION_FILE], "run": run_predict, "salt": predict_salt},
+    "export": {"deps": ["fetch"], "inputs": [DATA_FILE], "outputs": [EXPORT_FILE], "run": run_export},
+}
+
+def stage_fingerprint(name, input_hashes):
+    stage = STAGES[name]
+    parts = [name, str(PIPELINE_VERSION)]
+    parts += [f"{path}={input_hashes[path]}" for path in stage["inputs"]]
+    if "salt" in stage:
+        parts.append(stage["salt"]())
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+def is_up_to_date(record, fingerprint, current_hash):
+    """
+    A stage is current if its inputs match the last run and its outputs are untouched since.
+    current_hash(path) returns the content hash of a data file as it is now.
+    """
+    if not record or record.get("fingerprint") != fingerprint:
+        return False
+    for path, recorded in record.get("outputs", {}).items():
+        if recorded is None or current_hash(path) != recorded:
+            return False
+    return True
+
+def resolve_stages(requested):
+    """Return the requested stages plus everything upstream of them."""
+    selected = set()
+    pending = list(requested)
+    while pending:
+        name = pending.pop()
+        if name not in selected:
+            selected.add(name)
+            pending.extend(STAGES[name]["deps"])
+    return [name for name in STAGES if name in selected]
+
+# ---------------------------------------
+# Runner
+# ---------------------------------------
+def run_pipeline(stages=None, force=False, fetch=True, jobs=4):
+    """
+    Run the requested stages (default: all) and their upstream dependencies.
+    Returns {stage: {"status": "ran" | "skipped" | "failed", "result": ...}}.
+    """
+    selected = resolve_stages(stages or list(STAGES))
+    if not fetch and "fetch" in selected:
+        selected.remove("fetch")
+    state = load_state()
+    results = {}
+    # Stages left out of this run (e.g. fetch with --no-fetch) count as already done.
+    done = set(STAGES) - set(selected)
+    running = {}
+    # Content hashes of the data files, computed once per run: hashing the data file means
+    # parsing it, and it is an input or output of most stages. Only this thread touches it;
+    # a stage's outputs are updated from its record when it finishes.
+    hashes = {}
+
+    def current_hash(path):
+        if path not in hashes:
+            hashes[path] = file_hash(resource_path(path))
+        return hashes[path]
+
+    def start_stage(executor, name):
+        stage = STAGES[name]
+        input_hashes = {path: current_hash(path) for path in stage["inputs"]}
+        missing = [path for path, digest in input_hashes.items() if digest is None]
+        if missing:
+            print(f"[{name}] failed: missing input {', '.join(missing)}")
+            results[name] = {"status": "failed", "result": None}
+            return None
+        fingerprint = stage_fingerprint(name, input_hashes)
+        record = state.get(name)
+        if not force and not stage.get("always") and is_up_to_date(record, fingerprint, current_hash):
+            print(f"[{name}] skipped (inputs unchanged)")
+            results[name] = {"status": "skipped", "result": record.get("result")}
+            return None
+        print(f"[{name}] running...")
+        return executor.submit(execute_stage, name, input_hashes, fingerprint)
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        while len(done) < len(STAGES):
+            for name in selected:
+                if name in done or name in running:
+                    continue
+                deps = STAGES[name]["deps"]
+                # Look results up fresh: a dependency may have failed earlier in this same pass.
+                if any(results.get(dep, {}).get("status") == "failed" for dep in deps):
+                    print(f"[{name}] not run: upstream stage failed")
+                    results[name] = {"status": "failed", "result": None}
+                    done.add(name)
+                elif all(dep in done for dep in deps):
+                    future = start_stage(executor, name)
+                    if future is None:
+                        done.add(name)
+                    else:
+                        running[name] = future
+            if not running:
+                continue
+            finished, _ = wait(running.values(), return_when=FIRST_COMPLETED)
+            for name, future in list(running.items()):
+                if future not in finished:
+                    continue
+                del running[name]
+                done.add(name)
+                try:
+                    record = future.result()
+                except Exception as e:
+                    print(f"[{name}] failed: {e}")
+                    results[name] = {"status": "failed", "result": None}
+                    # The stage may have written part of its outputs; hash them again if asked.
+                    for path in STAGES[name]["outputs"]:
+                        hashes.pop(path, None)
+                    continue
+                hashes.update(record["outputs"])
+                state[name] = record
+                save_state(state)
+                print(f"[{name}] done in {record['seconds']:.2f}s")
+                results[name] = {"status": "ran", "result": record.get("result")}
+    return results
+
+@instrumentation.profiled
+def execute_stage(name, input_hashes, fingerprint):
+    stage = STAGES[name]
+    started = time.perf_counter()
+    with instrumentation.span(f"pipeline.{name}"):
+        result = stage["run"]()
+    return {
+        "fingerprint": fingerprint,
+        "inputs": input_hashes,
+        "outputs": {path: file_hash(resource_path(path)) for path in stage["outputs"]},
+        "result": result,
+        "seconds": round(time.perf_counter() - started, 3),
+        "completed": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the space weather pipeline headlessly.")
+    parser.add_argument("stages", nargs="*", metavar="stage",
+                        help=f"stages to run along with their dependencies: {', '.join(STAGES)} (default: all)")
+    parser.add_argument("--force", action="store_true", help="rerun stages even if their inputs are unchanged")
+    parser.add_argument("--no-fetch", action="store_true", help="reuse the data already on disk")
+    parser.add_argument("--offline", action="store_true", help="serve the fetch from the response cache only")
+    parser.add_argument("--profile", action="store_true",
+                        help="record timings and write a summary and cProfile dump to profile/")
+    parser.add_argument("--jobs", type=int, default=4, help="maximum number of stages run in parallel")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.stages if name not in STAGES]
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(unknown)}")
+    if args.offline:
+        os.environ["SPACE_WEATHER_OFFLINE"] = "1"
+    if args.profile:
+        instrumentation.enable()
+
+    results = run_pipeline(args.stages, force=args.force, fetch=not args.no_fetch, jobs=args.jobs)
+    if results.get("predict", {}).get("result"):
+        print(results["predict"]["result"])
+    return 1 if any(r["status"] == "failed" for r in results.values()) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,232 @@
+"""
+Central refresh scheduler.
+
+Owns the refresh cadence for the GUI (and headless runs): fetches DONKI data at a
+configurable interval with jitter and exponential backoff, and retrains/predicts only
+when new data lands. Listeners are notified only when the results actually change.
+
+Usage:
+    python -m ai_space_weather.scheduler --interval 3600
+"""
+import argparse
+import os
+import random
+import threading
+import time
+from datetime import datetime
+
+from ai_space_weather import instrumentation
+from ai_space_weather.ai_model import resource_path, DATA_FILE
+from ai_space_weather.pipeline import file_hash, run_pipeline
+
+FETCH_INTERVAL = 6 * 3600   # seconds between DONKI fetches
+FETCH_JITTER = 0.1          # +/- fraction of the delay, so many clients don't hit the API in lockstep
+RETRY_DELAY = 60            # first retry after a failed fetch; doubles on each further failure
+MAX_BACKOFF = 3600
+WATCH_INTERVAL = 5          # seconds between checks of the data file for outside changes
+STOP_TIMEOUT = 120          # seconds stop() waits for a fetch or retrain in progress
+
+class RefreshScheduler:
+    """
+    Runs fetches and refreshes on one background thread.
+
+    Refreshes are triggered by new data from our own fetch, by the data file changing on
+    disk (e.g. a cron pipeline run), by request_refresh(), and once a day because
+    predictions are expressed in days from today. Overlapping triggers coalesce into one refresh.
+    """
+
+    def __init__(self, fetch_interval=FETCH_INTERVAL, jitter=FETCH_JITTER, max_backoff=MAX_BACKOFF,
+                 watch_interval=WATCH_INTERVAL, fetch=None):
+        self.fetch_interval = fetch_interval
+        self.jitter = jitter
+        self.max_backoff = max_backoff
+        self.watch_interval = watch_interval
+        if fetch is None:
+            from ai_space_weather.weather_fetch import fetch_space_weather
+            fetch = fetch_space_weather
+        self._fetch = fetch
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._refresh_requested = True      # populate listeners on start
+        self._fetch_requested = False
+        self._failures = 0
+        self._next_fetch = self._initial_fetch_time()
+        self._data_path = resource_path(DATA_FILE)
+        self._data_mtime = self._mtime()
+        self._data_hash = file_hash(self._data_path)
+        self._refresh_day = None
+        self.latest = None
+
+    def _initial_fetch_time(self):
+        # Don't refetch on every launch if the data on disk is still fresh.
+        path = resource_path(DATA_FILE)
+        if not os.path.exists(path):
+            return time.time()
+        return os.path.getmtime(path) + self._jittered(self.fetch_interval)
+
+    def _jittered(self, delay):
+        return delay * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def _mtime(self):
+        try:
+            return os.path.getmtime(self._data_path)
+        except OSError:
+            return None
+
+    # ---------------------------------------
+    # Public API
+    # ---------------------------------------
+    def subscribe(self, callback):
+        """
+        Register callback(results), called from the scheduler thread whenever the results change.
+        results is {"prediction": str, "data_hash": str, "data_mtime": float}. The latest results are delivered immediately.
+        """
+        with self._lock:
+            self._listeners.append(callback)
+            latest = self.latest
+        if latest is not None:
+            callback(latest)
+
+    def request_refresh(self):
+        """Ask for a refresh (in-process event). Multiple requests before it runs are coalesced."""
+        with self._lock:
+            self._refresh_requested = True
+        self._wake.set()
+
+    def request_fetch(self):
+        """Fetch now instead of waiting for the next scheduled fetch."""
+        with self._lock:
+            self._fetch_requested = True
+        self._wake.set()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="refresh-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=STOP_TIMEOUT):
+        """
+        Stop the scheduler and wait for a fetch or retrain in progress to finish,
+        so the process doesn't exit halfway through writing the data or model files.
+        Listeners are dropped first, since the UI they update may already be gone.
+        """
+        with self._lock:
+            self._listeners = []
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    # ---------------------------------------
+    # Scheduler thread
+    # ---------------------------------------
+    @instrumentation.profiled
+    def _run(self):
+        while not self._stopped.is_set():
+            now = time.time()
+            with self._lock:
+                fetch_due = self._fetch_requested or now >= self._next_fetch
+                self._fetch_requested = False
+            if fetch_due:
+                self._do_fetch()
+            if self._stopped.is_set():
+                break
+
+            self._check_data_file()
+            if datetime.utcnow().date() != self._refresh_day:
+                self.request_refresh()
+
+            with self._lock:
+                refresh_due = self._refresh_requested
+                self._refresh_requested = False
+            if refresh_due:
+                self._do_refresh()
+
+            timeout = min(self.watch_interval, max(self._next_fetch - time.time(), 0))
+            self._wake.wait(timeout)
+            self._wake.clear()
+
+    def _do_fetch(self):
+        try:
+            ok = self._fetch()
+        except Exception as e:
+            print(f"Scheduled fetch failed: {e}")
+            ok = False
+        if ok:
+            self._failures = 0
+            delay = self.fetch_interval
+        else:
+            self._failures += 1
+            instrumentation.count("fetch.retries")
+            delay = min(self.max_backoff, RETRY_DELAY * 2 ** (self._failures - 1))
+            print(f"Fetch failed {self._failures} time(s), retrying in {int(delay)}s")
+        with self._lock:
+            self._next_fetch = time.time() + self._jittered(delay)
+
+    def _check_data_file(self):
+        """Treat the data file as changed only when its content (not just its mtime) differs."""
+        mtime = self._mtime()
+        if mtime == self._data_mtime:
+            return
+        self._data_mtime = mtime
+        new_hash = file_hash(self._data_path)
+        if new_hash != self._data_hash:
+            self._data_hash = new_hash
+            self.request_refresh()
+        elif self.latest is not None:
+            # Same events, new fetch timestamp: listeners only need to redraw "Last Updated".
+            self._publish(dict(self.latest, data_mtime=mtime))
+
+    def _do_refresh(self):
+        self._refresh_day = datetime.utcnow().date()
+        instrumentation.count("scheduler.refreshes")
+        try:
+            # The pipeline retrains whatever changed data invalidates, including data fetched
+            # while the app was closed, and skips the stages that are already up to date.
+            results = run_pipeline(["predict"], fetch=False)
+            prediction = results["predict"]["result"] or "No prediction available"
+        except Exception as e:
+            print(f"Refresh failed: {e}")
+            return
+        self._publish({"prediction": prediction, "data_hash": self._data_hash, "data_mtime": self._data_mtime})
+
+    def _publish(self, results):
+        with self._lock:
+            if results == self.latest:
+                return
+            self.latest = results
+            listeners = list(self._listeners)
+        for callback in listeners:
+            try:
+                callback(results)
+            except Exception as e:
+                print(f"Refresh listener failed: {e}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Keep space weather data and predictions up to date.")
+    parser.add_argument("--interval", type=float, default=FETCH_INTERVAL, help="seconds between fetches")
+    parser.add_argument("--jitter", type=float, default=FETCH_JITTER, help="random +/- fraction applied to each delay")
+    parser.add_argument("--profile", action="store_true",
+                        help="record timings; a summary and cProfile dump are written to profile/ on exit")
+    parser.add_argument("--metrics-port", type=int,
+                        help="serve Prometheus metrics on this port (implies --profile without cProfile)")
+    args = parser.parse_args(argv)
+    if args.profile or args.metrics_port:
+        instrumentation.enable(profile=args.profile)
+    if args.metrics_port:
+        instrumentation.serve_metrics(args.metrics_port)
+
+    scheduler = RefreshScheduler(fetch_interval=args.interval, jitter=args.jitter)
+    scheduler.subscribe(lambda results: print(results["prediction"]))
+    scheduler.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        scheduler.stop()
+
+if __name__ == "__main__":
+    main()
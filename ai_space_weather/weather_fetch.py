@@ -4,6 +4,8 @@ import requests
 import json
 import datetime
 import os
+from ai_space_weather import instrumentation
+from ai_space_weather.http_cache import ResponseCache
 
 # NASA API Endpoints
 NASA_SOLAR_FLARE_API = "https://api.nasa.gov/DONKI/FLR"
@@ -17,6 +19,12 @@ API_KEY = "YOUR_NASA_API_KEY_HERE"  # Get your key from https://api.nasa.gov/
 
 DATA_FILE = "data/space_weather_data.json"
 
+# DONKI entries are still revised for a while after an event; older months are treated as final.
+SETTLE_DAYS = 30
+
+# Cache of raw DONKI responses, so historical months are only downloaded once
+response_cache = ResponseCache()
+
 # Function to process solar flare data
 def process_solar_flare_data(flares_data):
     """Processes solar flare data, estimating duration if not provided."""
@@ -57,22 +65,62 @@ def process_solar_flare_data(flares_data):
     
     return processed_flares
 
-# Function to fetch NASA space weather data
-def fetch_space_weather():
-    try:
-        end_date = datetime.datetime.utcnow().strftime("%Y-%m-%d")
-        start_date = (datetime.datetime.utcnow() - datetime.timedelta(days=10*365)).strftime("%Y-%m-%d")
-
+# Function to split the fetch range into query windows
+def fetch_windows(start_date, end_date):
+    """
+    Split [start_date, end_date] into query windows, as (window_start, window_end, closed) tuples.
+
+    Settled history (complete months that ended more than SETTLE_DAYS ago) is fetched in
+    calendar-year windows, which never change once cached; the current year's settled months
+    form one window up to the last settled month. The unsettled recent range is fetched
+    month by month, so only those small windows are revalidated on later runs.
+    """
+    windows = []
+    settled_before = end_date - datetime.timedelta(days=SETTLE_DAYS)
+    # The month containing settled_before hasn't fully settled yet.
+    first_open = settled_before.replace(day=1)
+
+    current = start_date.replace(day=1)
+    while current < first_open:
+        year_end = current.replace(month=12, day=31)
+        window_end = min(year_end, first_open - datetime.timedelta(days=1))
+        windows.append((current, window_end, True))
+        current = window_end + datetime.timedelta(days=1)
+
+    while current <= end_date:
+        next_month = (current.replace(day=28) + datetime.timedelta(days=4)).replace(day=1)
+        windows.append((current, min(next_month - datetime.timedelta(days=1), end_date), False))
+        current = next_month
+    return windows
+
+# Function to fetch one DONKI endpoint window by window through the response cache
+def fetch_endpoint(url, windows, session=None, offline=None):
+    events = []
+    for window_start, window_end, closed in windows:
         params = {
-            "startDate": start_date,
-            "endDate": end_date,
+            "startDate": window_start.strftime("%Y-%m-%d"),
+            "endDate": window_end.strftime("%Y-%m-%d"),
             "api_key": API_KEY
         }
+        with instrumentation.span("fetch.window"):
+            events.extend(response_cache.get_json(url, params, closed, session=session, offline=offline))
+    return events
+
+# Function to fetch NASA space weather data
+def fetch_space_weather(offline=None):
+    """
+    Fetch all DONKI event types and save them. Returns True if the data file was written.
+    With offline=True (or SPACE_WEATHER_OFFLINE=1) everything is served from the response cache.
+    """
+    try:
+        end_date = datetime.datetime.utcnow().date()
+        # Windows are aligned to whole months so settled history keeps the same cache keys.
+        windows = fetch_windows(end_date - datetime.timedelta(days=10*365), end_date)
+        session = requests.Session()
 
         # Fetch NASA Solar Flare Data
         print("Fetching Solar Flares...")
-        flares_response = requests.get(NASA_SOLAR_FLARE_API, params=params)
-        flares_data = flares_response.json() if flares_response.status_code == 200 else []
+        flares_data = fetch_endpoint(NASA_SOLAR_FLARE_API, windows, session, offline)
 
         print(f"Found {len(flares_data)} solar flares")
 
@@ -81,32 +129,29 @@ def fetch_space_weather():
 
         # Fetch NASA Geomagnetic Storm Data
         print("Fetching Geomagnetic Storms...")
-        geo_storm_response = requests.get(NASA_GEO_STORM_API, params=params)
-        geo_storm_data = geo_storm_response.json() if geo_storm_response.status_code == 200 else []
+        geo_storm_data = fetch_endpoint(NASA_GEO_STORM_API, windows, session, offline)
         print(f"Found {len(geo_storm_data)} geomagnetic storms")
 
         # Fetch CME Data
         print("Fetching Coronal Mass Ejections (CME)...")
-        cme_response = requests.get(NASA_CME_API, params=params)
-        cme_data = cme_response.json() if cme_response.status_code == 200 else []
+        cme_data = fetch_endpoint(NASA_CME_API, windows, session, offline)
         print(f"Found {len(cme_data)} CMEs")
 
         # Fetch SEP Data
         print("Fetching Solar Energetic Particles (SEP)...")
-        sep_response = requests.get(NASA_SEP_API, params=params)
-        sep_data = sep_response.json() if sep_response.status_code == 200 else []
+        sep_data = fetch_endpoint(NASA_SEP_API, windows, session, offline)
         print(f"Found {len(sep_data)} SEP events")
 
         # Fetch IPS Data
         print("Fetching Interplanetary Shocks (IPS)...")
-        ips_response = requests.get(NASA_IPS_API, params=params)
-        ips_data = ips_response.json() if ips_response.status_code == 200 else []
+        ips_data = fetch_endpoint(NASA_IPS_API, windows, session, offline)
         print(f"Found {len(ips_data)} IPS events")
 
-        save_data_to_file(processed_flares, geo_storm_data, cme_data, sep_data, ips_data)
+        return save_data_to_file(processed_flares, geo_storm_data, cme_data, sep_data, ips_data)
 
     except Exception as e:
         print(f"Error fetching space weather data: {e}")
+        return False
 
 # Function to save fetched data
 def save_data_to_file(flares_data, geo_storm_data, cme_data, sep_data, ips_data):
@@ -160,13 +205,19 @@ def save_data_to_file(flares_data, geo_storm_data, cme_data, sep_data, ips_data)
         }
 
         os.makedirs(os.path.dirname(DATA_FILE), exist_ok=True)
-        with open(DATA_FILE, "w") as f:
-            json.dump(data, f, indent=4)
+        # Write to a temp file and swap it in, so an interrupted save never truncates the dataset.
+        tmp_file = DATA_FILE + ".tmp"
+        with instrumentation.span("json.save"):
+            with open(tmp_file, "w") as f:
+                json.dump(data, f, indent=4)
+            os.replace(tmp_file, DATA_FILE)
 
         print("Data saved successfully.")
+        return True
 
     except Exception as e:
         print(f"Error saving data: {e}")
+        return False
 
 # Run function when script executes
 if __name__ == "__main__":
@@ -0,0 +1,396 @@
+"""
+Benchmark suite for the fetch -> features -> train -> predict -> UI hot paths.
+
+Runs every case on synthetic DONKI data at each scale (1x, 10x, 100x the shipped
+data by default), estimates how each case scales, and compares against a stored
+baseline. Results are written as JSON; a readable summary goes to stderr.
+
+Usage:
+    python -m benchmarks.run_benchmarks --output results.json
+    python -m benchmarks.run_benchmarks --scales 1 10 --save-baseline
+    python -m benchmarks.run_benchmarks --baseline benchmarks/baseline.json
+
+Exits with status 1 if any case is slower than the baseline by more than --threshold.
+"""
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+from benchmarks.synthetic import BASE_COUNTS, generate_payloads, generate_predictions
+
+DEFAULT_SCALES = [1, 10, 100]
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+EXTRACT_SAMPLE = 50         # extract_features calls timed per scale
+LOOP_SAMPLE = 50            # build_training_set iterations timed per scale
+MIN_TRAINING_FLARES = 10    # build_training_set gives up below this
+MIN_PILOT_FLARES = 100      # smallest pilot scale, so every case has real work to do
+PREDICTIONS_PER_SCALE = 365 # prediction log entries at scale 1 (a year of daily predictions)
+MIN_COMPARABLE = 0.001      # seconds; faster timings are too noisy to compare against a baseline
+
+# ---------------------------------------
+# Cases
+# ---------------------------------------
+# Each case gets the per-scale context dict and returns the function to time, or
+# (function, factor) when it times a sample and the full run is estimated as factor times
+# that, or None when the data at this scale is too small for the case to do any work.
+# Setups build their own inputs through the helpers below (cached in the context),
+# so any case can run even when the budget skipped the cases before it.
+# "exponent" is the expected growth of its run time with data size (0 = constant, 1 = linear).
+
+def _quietly(fn, *args):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args)
+
+def _flares(ctx):
+    from ai_space_weather.weather_fetch import process_solar_flare_data
+    if "flares" not in ctx:
+        ctx["flares"] = process_solar_flare_data(ctx["payloads"]["FLR"])
+    return ctx["flares"]
+
+def _data(ctx):
+    """The saved data file's contents at this scale, writing the file first if needed."""
+    from ai_space_weather.weather_fetch import save_data_to_file, DATA_FILE
+    if "data" not in ctx:
+        p = ctx["payloads"]
+        _quietly(save_data_to_file, _flares(ctx), p["GST"], p["CME"], p["SEP"], p["IPS"])
+        with open(DATA_FILE, "r") as f:
+            ctx["data"] = json.load(f)
+    return ctx["data"]
+
+def _prediction_log(ctx):
+    """Write this scale's prediction log once."""
+    from ai_space_weather.ai_model import PREDICTION_FILE
+    if not ctx.get("prediction_log"):
+        with open(PREDICTION_FILE, "w") as f:
+            json.dump(generate_predictions(int(PREDICTIONS_PER_SCALE * ctx["scale"])), f)
+        ctx["prediction_log"] = True
+
+def _random_training_set(rows):
+    rng = np.random.default_rng(42)
+    features = rng.integers(0, 30, size=(rows, 10)).tolist()
+    return features, rng.integers(1, 6, size=rows).tolist(), rng.integers(1, 10, size=rows).tolist()
+
+def case_process_flares(ctx):
+    from ai_space_weather.weather_fetch import process_solar_flare_data
+    flares = ctx["payloads"]["FLR"]
+    if not flares:
+        return None
+    def run():
+        process_solar_flare_data(flares)
+    return run
+
+def case_save_data(ctx):
+    from ai_space_weather.weather_fetch import save_data_to_file
+    p = ctx["payloads"]
+    flares = _flares(ctx)
+    def run():
+        save_data_to_file(flares, p["GST"], p["CME"], p["SEP"], p["IPS"])
+    return run
+
+def case_extract_features(ctx):
+    from ai_space_weather.ai_model import extract_features
+    data = _data(ctx)
+    flares = data["solar_flares"]
+    if not flares:
+        return None
+    step = max(len(flares) // EXTRACT_SAMPLE, 1)
+    sample = flares[::step][:EXTRACT_SAMPLE]
+    args = (data["geomagnetic_storms"], data["coronal_mass_ejections"],
+            data["solar_energetic_particles"], data["interplanetary_shocks"])
+    def run():
+        for flare in sample:
+            extract_features(flare, *args)
+    return run
+
+def case_feature_loop(ctx):
+    from ai_space_weather.ai_model import build_training_set
+    data = _data(ctx)
+    flares = sorted(data["solar_flares"], key=lambda flare: flare.get("beginTime", ""))
+    if len(flares) < MIN_TRAINING_FLARES:
+        return None
+    # Every iteration scans the full event lists, so timing a sample of flares against
+    # them keeps the per-iteration cost while staying cheap at 100x.
+    step = max(len(flares) // (LOOP_SAMPLE + 2), 1)
+    sample = flares[::step][:LOOP_SAMPLE + 2]
+    sampled = dict(data, solar_flares=sample)
+    def run():
+        build_training_set(sampled)
+    return run, (len(flares) - 2) / (len(sample) - 2)
+
+def case_model_fit(ctx):
+    from ai_space_weather.ai_model import fit_models
+    # fit_models imports scikit-learn lazily; import it here so the timed fit doesn't pay for it.
+    import sklearn.ensemble, sklearn.metrics, sklearn.model_selection  # noqa: F401
+    rows = len(_data(ctx)["solar_flares"]) - 2
+    if rows < MIN_TRAINING_FLARES:
+        return None
+    # Random features of the training set's shape: the real ones would need the full feature loop.
+    training_set = _random_training_set(rows)
+    def run():
+        fit_models(*training_set)
+    return run
+
+def case_predict(ctx):
+    from ai_space_weather.ai_model import predict_next_solar_event, fit_models, MODEL_FILE, TIME_MODEL_FILE
+    _data(ctx)
+    if not (os.path.exists(MODEL_FILE) and os.path.exists(TIME_MODEL_FILE)):
+        # model_fit was skipped at every scale so far; inference only needs some fitted models.
+        _quietly(fit_models, *_random_training_set(500))
+    return predict_next_solar_event
+
+def case_save_prediction(ctx):
+    from ai_space_weather.ai_model import save_prediction
+    _prediction_log(ctx)
+    counter = iter(range(1000, 10 ** 9))
+    def run():
+        # A new estimate every call, so the duplicate check never short-circuits the write.
+        save_prediction("M-Class", next(counter))
+    return run
+
+def case_load_predictions(ctx):
+    from ai_space_weather.ai_model import load_past_predictions
+    _prediction_log(ctx)
+    return load_past_predictions
+
+def case_history_text(ctx):
+    from ai_space_weather.ai_model import load_past_predictions
+    from ai_space_weather.main import build_history_text
+    data = _data(ctx)
+    _prediction_log(ctx)
+    past_predictions = load_past_predictions()
+    def run():
+        build_history_text(data, "Predicted Solar Event Class: M-Class (Estimated in 3 days)", past_predictions)
+    return run
+
+CASES = [
+    {"name": "process_solar_flare_data", "setup": case_process_flares, "exponent": 1},
+    {"name": "save_data_to_file", "setup": case_save_data, "exponent": 1},
+    {"name": "extract_features", "setup": case_extract_features, "exponent": 0,
+     "unit": f"{EXTRACT_SAMPLE} calls"},
+    {"name": "train_feature_loop", "setup": case_feature_loop, "exponent": 1,
+     "unit": f"1 call, estimated from {LOOP_SAMPLE} iterations"},
+    {"name": "model_fit", "setup": case_model_fit, "exponent": 1},
+    {"name": "predict_next_solar_event", "setup": case_predict, "exponent": 1},
+    {"name": "save_prediction", "setup": case_save_prediction, "exponent": 1},
+    {"name": "load_past_predictions", "setup": case_load_predictions, "exponent": 1},
+    {"name": "update_history_text", "setup": case_history_text, "exponent": 1},
+]
+
+# ---------------------------------------
+# Runner
+# ---------------------------------------
+def time_call(fn, repeat):
+    """Return (best, mean) seconds over up to `repeat` runs; slow cases (>1s total) run once."""
+    times = []
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - started)
+        if sum(times) > 1.0:
+            break
+    return min(times), sum(times) / len(times)
+
+def scaling_exponent(points):
+    """Least-squares slope of log(time) against log(scale)."""
+    points = [(s, t) for s, t in points if t > 0]
+    if len(points) < 2:
+        return None
+    xs = [math.log(s) for s, _ in points]
+    ys = [math.log(t) for _, t in points]
+    mx, my = sum(xs) / len(xs), sum(ys) / len(ys)
+    denom = sum((x - mx) ** 2 for x in xs)
+    if denom == 0:
+        return None
+    return sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / denom
+
+def projected_seconds(history, scale, single_point_exponent=2.0):
+    """
+    Estimate a case's time at `scale` from the growth between its last two measurements,
+    assuming at least linear growth. With a single measurement, growth is assumed to be
+    n^single_point_exponent (quadratic unless the caller knows the step is small).
+    """
+    if not history:
+        return 0.0
+    last_scale, last_time = history[-1]
+    exponent = scaling_exponent(history[-2:])
+    if exponent is None:
+        exponent = single_point_exponent
+    return last_time * (scale / last_scale) ** max(exponent, 1.0)
+
+def _round_scale(scale):
+    return float(f"{scale:.2g}")
+
+def pilot_scales(smallest):
+    """
+    Up to two cheap scales below `smallest`: a hundredth and a tenth of it, but never fewer
+    than MIN_PILOT_FLARES flares, where the cases would measure little besides fixed overhead.
+    """
+    low = max(smallest / 100, MIN_PILOT_FLARES / BASE_COUNTS["FLR"])
+    if smallest / low < 3:
+        return []
+    if smallest / low < 10:
+        return [_round_scale(low)]
+    return [_round_scale(low), _round_scale(math.sqrt(low * smallest))]
+
+def run_benchmarks(scales, repeat=3, budget=60.0, pilot=True, log=sys.stderr):
+    """
+    Time every case at each scale. With pilot=True up to two cheap extra scales run first
+    (see pilot_scales), so the budget check projects the requested scales from measured
+    growth rather than from the pessimistic single-measurement guess.
+    """
+    requested_scales = list(scales)
+    pilots = pilot_scales(min(scales)) if pilot else []
+    scales = pilots + requested_scales
+    results = {case["name"]: {} for case in CASES}
+    # Run times as measured, for the budget check, and the full-run times they stand for
+    # (the same unless the case times a sample), for exponents.
+    history = {case["name"]: [] for case in CASES}
+    estimated = {case["name"]: [] for case in CASES}
+    previous_cwd = os.getcwd()
+    # One working directory for all scales, so models fitted at a smaller scale are
+    # still there for predict_next_solar_event if model_fit is skipped at a larger one.
+    with tempfile.TemporaryDirectory(prefix="space-weather-bench-") as workdir:
+        # The app resolves its data files relative to the working directory.
+        os.chdir(workdir)
+        os.makedirs("data")
+        try:
+            for scale in scales:
+                print(f"--- scale {scale}x ---", file=log)
+                ctx = {"scale": scale, "payloads": generate_payloads(scale)}
+                for case in CASES:
+                    name = case["name"]
+                    # A step up from a pilot is at most 10x, so a linear guess can overshoot the
+                    # budget only that much, and it keeps cases with a large fixed cost (model_fit)
+                    # from being skipped before their growth has been measured.
+                    after_pilot = bool(history[name]) and history[name][-1][0] in pilots
+                    projected = projected_seconds(history[name], scale, 1.0 if after_pilot else 2.0)
+                    if projected > budget:
+                        print(f"{name:28s} skipped (projected {projected:.0f}s > budget {budget:g}s)", file=log)
+                        results[name][str(scale)] = {"skipped": True, "projected_seconds": round(projected, 3)}
+                        continue
+                    timed = case["setup"](ctx)
+                    if timed is None:
+                        print(f"{name:28s} skipped (too little data)", file=log)
+                        results[name][str(scale)] = {"skipped": True}
+                        continue
+                    fn, factor = timed if isinstance(timed, tuple) else (timed, 1)
+                    best, mean = time_call(fn, repeat)
+                    history[name].append((scale, best))
+                    estimated[name].append((scale, best * factor))
+                    result = {"seconds": best * factor, "mean_seconds": mean * factor}
+                    if factor != 1:
+                        result["measured_seconds"] = best
+                    if scale in pilots:
+                        result["pilot"] = True
+                    results[name][str(scale)] = result
+                    print(f"{name:28s} {best * factor * 1000:10.2f} ms", file=log)
+        finally:
+            os.chdir(previous_cwd)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "scales": requested_scales,
+            "pilot_scales": pilots,
+        },
+        "cases": {},
+        "scaling_warnings": [],
+    }
+    for case in CASES:
+        name = case["name"]
+        # Report growth across the requested scales; the pilots are dominated by fixed overheads.
+        requested = [(scale, t) for scale, t in estimated[name] if scale not in pilots]
+        exponent = scaling_exponent(requested if len(requested) >= 2 else estimated[name])
+        report["cases"][name] = {
+            "unit": case.get("unit", "1 call"),
+            "expected_exponent": case["exponent"],
+            "exponent": round(exponent, 2) if exponent is not None else None,
+            "results": results[name],
+        }
+        if exponent is not None and exponent > case["exponent"] + 0.5:
+            report["scaling_warnings"].append(
+                f"{name} grows as n^{exponent:.2f}, expected n^{case['exponent']}")
+    return report
+
+def compare_to_baseline(report, baseline, threshold):
+    """
+    Annotate the report with current/baseline ratios; return the list of regressions.
+    Only requested scales are compared: pilot timings are mostly fixed overhead and noise.
+    """
+    regressions = []
+    comparison = {}
+    for name, case in report["cases"].items():
+        base_case = baseline.get("cases", {}).get(name, {}).get("results", {})
+        for scale, result in case["results"].items():
+            base = base_case.get(scale, {})
+            if result.get("pilot") or base.get("pilot"):
+                continue
+            if "seconds" not in result or "seconds" not in base:
+                continue
+            if max(result["seconds"], base["seconds"]) < MIN_COMPARABLE:
+                continue
+            ratio = result["seconds"] / base["seconds"]
+            comparison.setdefault(name, {})[scale] = round(ratio, 3)
+            if ratio > threshold:
+                regressions.append(f"{name} at {scale}x: {ratio:.2f}x slower than baseline")
+    report["baseline_comparison"] = comparison
+    report["regressions"] = regressions
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the space weather hot paths on synthetic data.")
+    parser.add_argument("--scales", type=float, nargs="+", default=DEFAULT_SCALES,
+                        help="data sizes relative to the shipped data file (default: 1 10 100)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case for fast cases; the best is reported")
+    parser.add_argument("--budget", type=float, default=60.0,
+                        help="skip a case at a scale when its projected time exceeds this many seconds")
+    parser.add_argument("--no-pilot", action="store_true",
+                        help="don't run the small extra scales used to project run times "
+                             "(projections then assume quadratic growth until two scales are measured)")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline report to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--threshold", type=float, default=1.5,
+                        help="slowdown ratio against the baseline that counts as a regression")
+    args = parser.parse_args(argv)
+
+    scales = [int(s) if float(s).is_integer() else s for s in args.scales]
+    report = run_benchmarks(scales, repeat=args.repeat, budget=args.budget, pilot=not args.no_pilot)
+
+    regressions = []
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, "r") as f:
+            regressions = compare_to_baseline(report, json.load(f), args.threshold)
+
+    for warning in report["scaling_warnings"]:
+        print(f"SCALING: {warning}", file=sys.stderr)
+    for regression in regressions:
+        print(f"REGRESSION: {regression}", file=sys.stderr)
+
+    output = json.dumps(report, indent=4)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            f.write(output)
+        print(f"Baseline saved to {args.baseline}", file=sys.stderr)
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+"""
+Generator for realistic synthetic DONKI payloads.
+
+Scale 1 matches the event counts in the shipped data/space_weather_data.json
+(10 years of data). Higher scales keep the same event density and extend the
+time span backwards, so per-day joins see the same number of matches per day.
+"""
+import random
+from datetime import datetime, timedelta
+
+# Event counts in the shipped 10-year data file
+BASE_COUNTS = {
+    "FLR": 2357,
+    "GST": 122,
+    "CME": 5748,
+    "SEP": 280,
+    "IPS": 642,
+}
+BASE_DAYS = 10 * 365
+END_TIME = datetime(2025, 2, 18)
+TIME_FORMAT = "%Y-%m-%dT%H:%MZ"
+
+FLARE_CLASSES = [("C", 0.6), ("M", 0.3), ("B", 0.05), ("X", 0.05)]
+CME_TYPES = ["S", "C", "O", "R", "ER"]
+INSTRUMENTS = ["GOES-P: EXIS 1.0-8.0", "SOHO: LASCO/C2", "STEREO A: SECCHI/COR2", "STEREO A: IMPACT 13-100 MeV"]
+
+def _times(rng, count, days):
+    """Sorted random event times spread over the `days` before END_TIME."""
+    start = END_TIME - timedelta(days=days)
+    minutes = sorted(rng.randrange(days * 24 * 60) for _ in range(count))
+    return [start + timedelta(minutes=m) for m in minutes]
+
+def _flare_class(rng):
+    letter = rng.choices([c for c, _ in FLARE_CLASSES], weights=[w for _, w in FLARE_CLASSES])[0]
+    return f"{letter}{rng.randint(1, 9)}.{rng.randint(0, 9)}"
+
+def generate_flares(rng, count, days):
+    flares = []
+    for i, begin in enumerate(_times(rng, count, days)):
+        peak = begin + timedelta(minutes=rng.randint(2, 30))
+        end = peak + timedelta(minutes=rng.randint(5, 90))
+        flares.append({
+            "flrID": f"{begin.strftime(TIME_FORMAT)[:16]}-FLR-{i:03d}",
+            "instruments": [{"displayName": INSTRUMENTS[0]}],
+            "beginTime": begin.strftime(TIME_FORMAT),
+            "peakTime": peak.strftime(TIME_FORMAT),
+            # DONKI leaves endTime out for a fair share of flares
+            "endTime": end.strftime(TIME_FORMAT) if rng.random() < 0.7 else None,
+            "classType": _flare_class(rng),
+            "sourceLocation": f"N{rng.randint(0, 40):02d}W{rng.randint(0, 90):02d}",
+            "activeRegionNum": rng.randint(12000, 14000),
+            "linkedEvents": None,
+        })
+    return flares
+
+def generate_storms(rng, count, days):
+    storms = []
+    for i, start in enumerate(_times(rng, count, days)):
+        kp = [{"observedTime": (start + timedelta(hours=3 * k)).strftime(TIME_FORMAT),
+               "kpIndex": rng.choice([5, 5.33, 5.67, 6, 6.33, 7, 8]),
+               "source": "NOAA"} for k in range(rng.randint(1, 4))]
+        storms.append({
+            "gstID": f"{start.strftime(TIME_FORMAT)}-GST-{i:03d}",
+            "startTime": start.strftime(TIME_FORMAT),
+            "allKpIndex": kp,
+            "linkedEvents": None,
+        })
+    return storms
+
+def generate_cmes(rng, count, days):
+    cmes = []
+    for i, start in enumerate(_times(rng, count, days)):
+        # Many CMEs never get an analysis
+        analyses = None
+        if rng.random() < 0.6:
+            analyses = [{
+                "time21_5": (start + timedelta(hours=rng.randint(1, 12))).strftime(TIME_FORMAT),
+                "latitude": rng.randint(-60, 60),
+                "longitude": rng.randint(-180, 180),
+                "halfAngle": rng.randint(10, 60),
+                "speed": rng.randint(200, 2500),
+                "type": rng.choice(CME_TYPES),
+                "isMostAccurate": True,
+            }]
+        cmes.append({
+            "activityID": f"{start.strftime(TIME_FORMAT)}-CME-{i:03d}",
+            "startTime": start.strftime(TIME_FORMAT),
+            "instruments": [{"displayName": INSTRUMENTS[1]}],
+            "cmeAnalyses": analyses,
+            "linkedEvents": None,
+        })
+    return cmes
+
+def generate_seps(rng, count, days):
+    return [{
+        "sepID": f"{t.strftime(TIME_FORMAT)}-SEP-{i:03d}",
+        "eventTime": t.strftime(TIME_FORMAT),
+        "instruments": [{"displayName": INSTRUMENTS[3]}],
+        "linkedEvents": None,
+    } for i, t in enumerate(_times(rng, count, days))]
+
+def generate_ips(rng, count, days):
+    return [{
+        "activityID": f"{t.strftime(TIME_FORMAT)}-IPS-{i:03d}",
+        "catalog": "M2M_CATALOG",
+        "location": rng.choice(["Earth", "STEREO A", "STEREO B"]),
+        "eventTime": t.strftime(TIME_FORMAT),
+        "instruments": [{"displayName": "ACE: SWEPAM"}],
+    } for i, t in enumerate(_times(rng, count, days))]
+
+def generate_payloads(scale=1, seed=42):
+    """
+    Return raw DONKI responses {"FLR": [...], "GST": [...], "CME": [...], "SEP": [...], "IPS": [...]}
+    at `scale` times the size of the shipped data.
+    """
+    rng = random.Random(seed)
+    days = int(BASE_DAYS * scale)
+    return {
+        "FLR": generate_flares(rng, int(BASE_COUNTS["FLR"] * scale), days),
+        "GST": generate_storms(rng, int(BASE_COUNTS["GST"] * scale), days),
+        "CME": generate_cmes(rng, int(BASE_COUNTS["CME"] * scale), days),
+        "SEP": generate_seps(rng, int(BASE_COUNTS["SEP"] * scale), days),
+        "IPS": generate_ips(rng, int(BASE_COUNTS["IPS"] * scale), days),
+    }
+
+def generate_predictions(count, seed=42):
+    """Return `count` entries in the data/solar_predictions.json format, one per day."""
+    rng = random.Random(seed)
+    start = END_TIME - timedelta(days=count)
+    predictions = []
+    for i in range(count):
+        ts = start + timedelta(days=i)
+        days = rng.randint(1, 10)
+        predictions.append({
+            "predicted_class": rng.choice(["X-Class", "M-Class", "C-Class"]),
+            "estimated_days": days,
+            "estimated_date": (ts + timedelta(days=days)).strftime("%Y-%m-%d"),
+            "timestamp": ts.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        })
+    return predictions
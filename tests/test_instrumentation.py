@@ -0,0 +1,138 @@
+import pstats
+import threading
+
+import pytest
+
+from ai_space_weather import instrumentation
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def perf_counter(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(instrumentation, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def recording(monkeypatch):
+    """Fresh, enabled instrumentation state; restored after the test."""
+    monkeypatch.setattr(instrumentation, "_enabled", True)
+    monkeypatch.setattr(instrumentation, "_spans", {})
+    monkeypatch.setattr(instrumentation, "_counters", {})
+    monkeypatch.setattr(instrumentation, "_folded", {})
+    monkeypatch.setattr(instrumentation, "_last_tick", {})
+    monkeypatch.setattr(instrumentation, "_thread_profiles", [])
+    monkeypatch.setattr(instrumentation, "_profiler", None)
+    monkeypatch.setattr(instrumentation, "_profiler_thread", None)
+    monkeypatch.setattr(instrumentation, "_run_name", None)
+
+
+def test_nested_spans_record_totals_and_self_time(recording, clock):
+    with instrumentation.span("outer"):
+        clock.now += 1.0
+        with instrumentation.span("inner"):
+            clock.now += 2.0
+        clock.now += 0.5
+
+    spans = instrumentation.summary()["spans"]
+    assert spans["outer"] == {"count": 1, "total_seconds": 3.5, "mean_seconds": 3.5, "max_seconds": 3.5}
+    assert spans["inner"]["total_seconds"] == 2.0
+    assert instrumentation._folded == {"outer": 1500000, "outer;inner": 2000000}
+
+
+def test_timed_records_each_call(recording, clock):
+    @instrumentation.timed("work")
+    def work(seconds):
+        clock.now += seconds
+        return seconds
+
+    assert work(1.0) == 1.0
+    work(3.0)
+
+    assert instrumentation.summary()["spans"]["work"] == {
+        "count": 2, "total_seconds": 4.0, "mean_seconds": 2.0, "max_seconds": 3.0}
+
+
+def test_counters_accumulate(recording):
+    instrumentation.count("fetch.requests")
+    instrumentation.count("fetch.requests")
+    instrumentation.count("fetch.bytes", 512)
+
+    assert instrumentation.summary()["counters"] == {"fetch.bytes": 512, "fetch.requests": 2}
+
+
+def test_frame_tick_records_intervals(recording, clock):
+    for _ in range(3):
+        instrumentation.frame_tick("ui.frame")
+        clock.now += 0.05
+
+    stat = instrumentation.summary()["spans"]["ui.frame"]
+    assert stat["count"] == 2
+    assert stat["mean_seconds"] == pytest.approx(0.05)
+
+
+def test_render_prometheus(recording, clock):
+    with instrumentation.span("fetch.request"):
+        clock.now += 0.25
+    instrumentation.count("fetch.cache-hits", 3)
+
+    assert instrumentation.render_prometheus() == (
+        "# TYPE space_weather_fetch_request_seconds summary\n"
+        "space_weather_fetch_request_seconds_count 1\n"
+        "space_weather_fetch_request_seconds_sum 0.25\n"
+        "# TYPE space_weather_fetch_request_seconds_max gauge\n"
+        "space_weather_fetch_request_seconds_max 0.25\n"
+        "# TYPE space_weather_fetch_cache_hits_total counter\n"
+        "space_weather_fetch_cache_hits_total 3\n"
+    )
+
+
+def test_disabled_records_nothing(recording, monkeypatch):
+    monkeypatch.setattr(instrumentation, "_enabled", False)
+
+    @instrumentation.timed("work")
+    def work():
+        return 42
+
+    assert instrumentation.span("block") is instrumentation._NOOP_SPAN
+    with instrumentation.span("block"):
+        pass
+    assert work() == 42
+    instrumentation.count("calls")
+    instrumentation.observe("latency", 1.0)
+    instrumentation.frame_tick("ui.frame")
+    instrumentation.frame_tick("ui.frame")
+
+    assert instrumentation.summary() == {"spans": {}, "counters": {}}
+    assert instrumentation._folded == {}
+    assert instrumentation.render_prometheus() == "\n"
+
+
+def test_profile_includes_worker_threads(recording, monkeypatch, tmp_path):
+    monkeypatch.setattr(instrumentation, "_enabled", False)
+    monkeypatch.setenv("SPACE_WEATHER_PROFILE_DIR", str(tmp_path))
+
+    def worker_only_function():
+        return sum(range(1000))
+
+    @instrumentation.profiled
+    def worker():
+        worker_only_function()
+
+    instrumentation.enable()
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+    instrumentation.finish()
+
+    [dump] = tmp_path.glob("*.prof")
+    functions = {name for _, _, name in pstats.Stats(str(dump)).stats}
+    assert "worker_only_function" in functions
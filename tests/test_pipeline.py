@@ -0,0 +1,72 @@
+import json
+import os
+
+import pytest
+
+from ai_space_weather import pipeline
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    # The app resolves its data files relative to the working directory.
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("data")
+    with open(pipeline.FEATURES_FILE, "w") as f:
+        json.dump({"features": [], "class_labels": [], "reg_targets": []}, f)
+    return tmp_path
+
+
+def _record_runs(monkeypatch, names):
+    ran = []
+    for name in names:
+        monkeypatch.setitem(pipeline.STAGES, name, dict(pipeline.STAGES[name], run=lambda name=name: ran.append(name)))
+    return ran
+
+
+def test_missing_input_blocks_downstream_stages(workdir, monkeypatch):
+    ran = _record_runs(monkeypatch, ["features", "train"])
+
+    results = pipeline.run_pipeline(["train"], fetch=False)
+
+    assert results["features"]["status"] == "failed"
+    assert results["train"]["status"] == "failed"
+    assert ran == []
+
+
+def test_failed_fetch_blocks_the_whole_chain(workdir, monkeypatch):
+    def failing_fetch():
+        raise RuntimeError("network down")
+
+    monkeypatch.setitem(pipeline.STAGES, "fetch", dict(pipeline.STAGES["fetch"], run=failing_fetch))
+    ran = _record_runs(monkeypatch, ["features", "train", "predict", "export"])
+
+    results = pipeline.run_pipeline(jobs=1)
+
+    assert {name: r["status"] for name, r in results.items()} == {
+        name: "failed" for name in pipeline.STAGES
+    }
+    assert ran == []
+
+
+def test_noop_run_hashes_each_file_once(workdir, monkeypatch):
+    def write_outputs(outputs):
+        for path in outputs:
+            with open(path, "w") as f:
+                f.write("{}")
+
+    for name, stage in list(pipeline.STAGES.items()):
+        monkeypatch.setitem(pipeline.STAGES, name, dict(stage, run=lambda outputs=stage["outputs"]: write_outputs(outputs)))
+    assert all(r["status"] == "ran" for r in pipeline.run_pipeline().values())
+
+    hashed = []
+    file_hash = pipeline.file_hash
+    monkeypatch.setattr(pipeline, "file_hash", lambda path: hashed.append(path) or file_hash(path))
+
+    results = pipeline.run_pipeline()
+
+    assert results["fetch"]["status"] == "ran"
+    assert {name: r["status"] for name, r in results.items() if name != "fetch"} == {
+        "features": "skipped", "train": "skipped", "predict": "skipped", "export": "skipped"}
+    data_path = os.path.abspath(pipeline.DATA_FILE)
+    assert hashed.count(data_path) == 1
+    assert len(hashed) == len(set(hashed))
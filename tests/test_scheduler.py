@@ -0,0 +1,162 @@
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from ai_space_weather import scheduler as scheduler_module
+from ai_space_weather.ai_model import DATA_FILE
+from ai_space_weather.scheduler import RefreshScheduler, RETRY_DELAY
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    # The app resolves its data files relative to the working directory.
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("data")
+    return tmp_path
+
+
+@pytest.fixture
+def pipeline_runs(monkeypatch):
+    """Replace the pipeline with a stub predicting "prediction <n>"; returns the list of calls."""
+    runs = []
+
+    def run_pipeline(stages, fetch=True):
+        runs.append(stages)
+        return {"predict": {"status": "ran", "result": f"prediction {len(runs)}"}}
+
+    monkeypatch.setattr(scheduler_module, "run_pipeline", run_pipeline)
+    return runs
+
+
+def write_data(flares, timestamp="2026-10-18 00:00:00.000000", mtime=None):
+    with open(DATA_FILE, "w") as f:
+        json.dump({"timestamp": timestamp, "solar_flares": flares}, f)
+    if mtime is not None:
+        os.utime(DATA_FILE, (mtime, mtime))
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_overlapping_refresh_requests_coalesce(workdir, monkeypatch):
+    release = threading.Event()
+    runs = []
+
+    def run_pipeline(stages, fetch=True):
+        runs.append(stages)
+        release.wait(5)
+        return {"predict": {"status": "ran", "result": f"prediction {len(runs)}"}}
+
+    monkeypatch.setattr(scheduler_module, "run_pipeline", run_pipeline)
+    write_data([])
+    scheduler = RefreshScheduler(watch_interval=0.01, fetch=lambda: True)
+    scheduler.start()
+    try:
+        wait_for(lambda: len(runs) == 1)
+        for _ in range(5):
+            scheduler.request_refresh()
+        release.set()
+        wait_for(lambda: len(runs) == 2)
+        time.sleep(0.1)
+    finally:
+        scheduler.stop()
+    assert runs == [["predict"], ["predict"]]
+    assert scheduler.latest["prediction"] == "prediction 2"
+
+
+def test_backoff_doubles_up_to_the_cap(workdir):
+    outcomes = [False, False, False, False, True]
+    scheduler = RefreshScheduler(fetch_interval=10000, jitter=0, max_backoff=3 * RETRY_DELAY,
+                                 fetch=lambda: outcomes.pop(0))
+
+    delays = []
+    for _ in range(5):
+        scheduler._do_fetch()
+        delays.append(round(scheduler._next_fetch - time.time()))
+
+    assert delays == [RETRY_DELAY, 2 * RETRY_DELAY, 3 * RETRY_DELAY, 3 * RETRY_DELAY, 10000]
+    assert scheduler._failures == 0
+
+
+def test_fetch_exception_counts_as_failure(workdir):
+    def fetch():
+        raise RuntimeError("network down")
+
+    scheduler = RefreshScheduler(jitter=0, fetch=fetch)
+    scheduler._do_fetch()
+    assert scheduler._failures == 1
+    assert round(scheduler._next_fetch - time.time()) == RETRY_DELAY
+
+
+def test_listeners_are_notified_only_when_results_change(workdir, monkeypatch):
+    monkeypatch.setattr(scheduler_module, "run_pipeline",
+                        lambda stages, fetch=True: {"predict": {"status": "skipped", "result": "M-Class"}})
+    write_data([])
+    scheduler = RefreshScheduler(fetch=lambda: True)
+    received = []
+    scheduler.subscribe(received.append)
+
+    scheduler._do_refresh()
+    scheduler._do_refresh()
+
+    assert [r["prediction"] for r in received] == ["M-Class"]
+    late = []
+    scheduler.subscribe(late.append)
+    assert late == received
+
+
+def test_data_changes_are_detected_by_content(workdir, pipeline_runs):
+    write_data([{"classType": "M1.0"}], mtime=1000)
+    scheduler = RefreshScheduler(fetch=lambda: True)
+    scheduler._do_refresh()
+    received = []
+    scheduler.subscribe(received.append)
+    scheduler._refresh_requested = False
+
+    # A refetch of the same events only rewrites the timestamp.
+    write_data([{"classType": "M1.0"}], timestamp="2026-10-18 06:00:00.000000", mtime=2000)
+    scheduler._check_data_file()
+    assert not scheduler._refresh_requested
+    assert len(pipeline_runs) == 1
+    assert received[-1]["data_mtime"] == 2000
+    assert received[-1]["prediction"] == "prediction 1"
+
+    write_data([{"classType": "M1.0"}, {"classType": "X2.0"}], mtime=3000)
+    scheduler._check_data_file()
+    assert scheduler._refresh_requested
+
+
+def test_refresh_always_goes_through_the_pipeline(workdir, pipeline_runs):
+    # Data written while the app was closed must still reach the models.
+    write_data([{"classType": "M1.0"}])
+    scheduler = RefreshScheduler(fetch=lambda: True)
+    scheduler._do_refresh()
+    assert pipeline_runs == [["predict"]]
+
+
+def test_stop_waits_for_a_fetch_in_progress(workdir, pipeline_runs):
+    started = threading.Event()
+    finished = []
+
+    def slow_fetch():
+        started.set()
+        time.sleep(0.3)
+        finished.append(True)
+        return True
+
+    scheduler = RefreshScheduler(watch_interval=0.01, fetch=slow_fetch)
+    scheduler.start()
+    assert started.wait(5)
+    scheduler.stop()
+
+    assert finished == [True]
+    assert not scheduler._thread.is_alive()
+    # Stop is checked after the fetch, so no refresh starts once shutdown is requested.
+    assert pipeline_runs == []
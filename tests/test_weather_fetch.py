@@ -0,0 +1,85 @@
+import datetime
+import json
+import os
+
+import pytest
+
+from ai_space_weather import weather_fetch
+
+
+class StubResponse:
+    def __init__(self, body):
+        self.status_code = 200
+        self.text = json.dumps(body)
+        self.content = self.text.encode("utf-8")
+        self.headers = {"ETag": '"v1"'}
+        self._body = body
+
+    def json(self):
+        return self._body
+
+
+class StubSession:
+    """Answers every DONKI query with one event dated at the start of the window."""
+
+    def __init__(self):
+        self.requests = []
+
+    def get(self, url, params, headers, timeout):
+        self.requests.append((url, params["startDate"], params["endDate"]))
+        time = params["startDate"] + "T00:00Z"
+        return StubResponse([{"beginTime": time, "startTime": time, "eventTime": time, "classType": "M1.0"}])
+
+
+@pytest.fixture
+def session(tmp_path, monkeypatch):
+    # The data file and the response cache live relative to the working directory.
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("SPACE_WEATHER_OFFLINE", raising=False)
+    stub = StubSession()
+    monkeypatch.setattr(weather_fetch.requests, "Session", lambda: stub)
+    return stub
+
+
+def _load_data():
+    with open(weather_fetch.DATA_FILE, "r") as f:
+        data = json.load(f)
+    data.pop("timestamp")
+    return data
+
+
+def test_fetch_windows_use_years_for_settled_history():
+    end = datetime.date(2026, 10, 18)
+    windows = weather_fetch.fetch_windows(end - datetime.timedelta(days=10 * 365), end)
+
+    assert windows[0] == (datetime.date(2016, 10, 1), datetime.date(2016, 12, 31), True)
+    assert (datetime.date(2026, 1, 1), datetime.date(2026, 8, 31), True) in windows
+    assert windows[-2:] == [
+        (datetime.date(2026, 9, 1), datetime.date(2026, 9, 30), False),
+        (datetime.date(2026, 10, 1), datetime.date(2026, 10, 18), False),
+    ]
+    assert len(windows) == 13
+
+
+def test_cold_fetch_request_count(session):
+    assert weather_fetch.fetch_space_weather()
+    end = datetime.datetime.utcnow().date()
+    windows = weather_fetch.fetch_windows(end - datetime.timedelta(days=10 * 365), end)
+    assert len(session.requests) == 5 * len(windows) <= 5 * 14
+
+
+def test_offline_replay_matches_online_fetch(session):
+    assert weather_fetch.fetch_space_weather()
+    online = _load_data()
+    session.requests.clear()
+
+    assert weather_fetch.fetch_space_weather(offline=True)
+
+    assert session.requests == []
+    assert _load_data() == online
+
+
+def test_offline_without_cache_fails_and_keeps_data(session):
+    assert not weather_fetch.fetch_space_weather(offline=True)
+    assert session.requests == []
+    assert not os.path.exists(weather_fetch.DATA_FILE)